@@ -0,0 +1,536 @@
+"""
+Motor de búsqueda del Wordle Solver, sin dependencias de Tkinter, para que la aplicación
+y las herramientas de línea de comandos compartan el mismo núcleo.
+"""
+import json
+import itertools
+import heapq
+import os
+import time
+from collections import Counter, defaultdict
+from bisect import bisect_left, bisect_right
+from operator import itemgetter
+from array import array
+
+def cargar_diccionario(ruta):
+    """ Carga la lista de palabras. Lanza FileNotFoundError si el fichero no existe. """
+    with open(ruta, encoding="utf-8") as f:
+        return json.load(f)
+
+# --- Lógica de Búsqueda (sin cambios en su núcleo) ---
+# MODIFICADO: El filtro es ahora un generador perezoso; `generar_palabras` conserva la lista completa.
+def iterar_palabras(patron, min_counts, exact_counts, letras_descartadas, posiciones_prohibidas, diccionario):
+    longitud = len(patron)
+
+    # Combina todas las letras que tienen alguna restricción (no depende de la palabra)
+    todas_letras_restringidas = set(min_counts.keys()) | set(exact_counts.keys()) | letras_descartadas
+
+    for palabra in diccionario: # Asumimos que el diccionario ya está pre-filtrado por longitud
+        
+        # Optimización: si una letra descartada no tiene reglas de conteo, la palabra no puede contenerla.
+        # Las letras con reglas de conteo (ej. exact_count=1) se manejan más adelante.
+        if any(letra in palabra for letra in letras_descartadas if letra not in exact_counts):
+            continue
+
+        palabra_valida = True
+        palabra_counter = Counter(palabra)
+
+        # Iteramos de una vez para aplicar todas las reglas a la palabra candidata
+        for i in range(longitud):
+            # 1. Comprobar patrón (letras verdes)
+            if patron[i] != '_' and patron[i] != palabra[i]:
+                palabra_valida = False
+                break
+            
+            # 2. Comprobar posiciones prohibidas (letras amarillas)
+            letra_actual = palabra[i]
+            if letra_actual in posiciones_prohibidas and i in posiciones_prohibidas[letra_actual]:
+                palabra_valida = False
+                break
+
+        if not palabra_valida: continue
+
+        # 3. Comprobar conteo de letras (la lógica clave)
+        for letra in todas_letras_restringidas:
+            # La regla de conteo exacto tiene la máxima prioridad
+            if letra in exact_counts:
+                if palabra_counter[letra] != exact_counts[letra]:
+                    palabra_valida = False
+                    break
+            # Si no hay regla exacta, usamos la regla de conteo mínimo
+            elif letra in min_counts:
+                if palabra_counter[letra] < min_counts[letra]:
+                    palabra_valida = False
+                    break
+            # Si no hay reglas de conteo, es una letra descartada simple
+            elif letra in letras_descartadas:
+                if palabra_counter[letra] > 0:
+                    palabra_valida = False
+                    break
+        
+        if not palabra_valida: continue
+
+        # Si la palabra ha superado todos los filtros, es una candidata válida
+        yield palabra
+
+def generar_palabras(patron, min_counts, exact_counts, letras_descartadas, posiciones_prohibidas, diccionario):
+    return list(iterar_palabras(patron, min_counts, exact_counts, letras_descartadas, posiciones_prohibidas, diccionario))
+
+def sugerir_letras(palabras):
+    contador = Counter()
+    for palabra in palabras:
+        contador.update(set(palabra))
+    return contador.most_common()
+
+def puntuar_palabra(palabra, letras_mas_frecuentes):
+    letras_unicas = set(palabra)
+    score = len(letras_unicas)
+    frecuencia = sum(letras_mas_frecuentes.get(l, 0) for l in letras_unicas)
+    return (frecuencia, score, palabra)
+
+# MODIFICADO: Acepta cualquier iterable y solo mantiene un montículo de k elementos
+def mejores_palabras(palabras, letras_mas_frecuentes, k=10):
+    ranking = heapq.nlargest(k, (puntuar_palabra(palabra, letras_mas_frecuentes) for palabra in palabras))
+    return [p for _, _, p in ranking]
+
+# NUEVO: Feedback de Wordle para un intento frente a una solución
+def calcular_patron(intento, solucion):
+    """
+    Devuelve el feedback como un entero en base 3, una cifra por letra (0=gris, 1=amarillo,
+    2=verde), con la primera letra como cifra más significativa. Respeta las letras repetidas.
+    """
+    longitud = len(intento)
+    estados = [0] * longitud
+    pendientes = Counter()
+    for i in range(longitud):
+        if intento[i] == solucion[i]:
+            estados[i] = 2
+        else:
+            pendientes[solucion[i]] += 1
+
+    codigo = 0
+    for i in range(longitud):
+        if estados[i] == 0 and pendientes[intento[i]] > 0:
+            estados[i] = 1
+            pendientes[intento[i]] -= 1
+        codigo = codigo * 3 + estados[i]
+    return codigo
+
+# --- NUEVO: Etapa de flujo que cuenta, acumula frecuencias y ordena sobre la marcha ---
+class EtapaFlujo:
+    """
+    Consume los candidatos uno a uno. Mantiene el total, las frecuencias de letras
+    (igual que `sugerir_letras`) y un top-k provisional calculado con las frecuencias
+    conocidas hasta ese momento. Si se le pasan unas frecuencias fijas (por ejemplo, las de
+    la búsqueda anterior) no cuenta nada y puntúa con ellas.
+    """
+    def __init__(self, k=10, frecuencias=None):
+        self.k = k
+        self.total = 0
+        self._contar = frecuencias is None
+        self.frecuencias = Counter() if frecuencias is None else frecuencias
+        self._monticulo = []  # min-heap de (frecuencia, score, palabra)
+
+    def consumir(self, palabra):
+        self.total += 1
+        if self._contar:
+            self.frecuencias.update(set(palabra))
+        entrada = puntuar_palabra(palabra, self.frecuencias)
+        if len(self._monticulo) < self.k:
+            heapq.heappush(self._monticulo, entrada)
+        elif entrada > self._monticulo[0]:
+            heapq.heapreplace(self._monticulo, entrada)
+
+    def provisional(self):
+        return [p for _, _, p in sorted(self._monticulo, reverse=True)]
+
+def buscar_en_flujo(patron, min_counts, exact_counts, letras_descartadas, posiciones_prohibidas, indice, al_progreso=None, intervalo=0.1, k=10, estadisticas=None):
+    """
+    Filtra el diccionario del índice de forma perezosa y procesa cada candidato en una sola
+    etapa. Cada `intervalo` segundos llama a `al_progreso(total, top_provisional)`.
+    Los candidatos quedan marcados en el índice (`indice.candidatos()`), de modo que el
+    ranking final se hace con una segunda pasada sobre esas marcas sin volver a filtrar.
+    Con `estadisticas` (EstadisticasLetras) las frecuencias se actualizan de forma incremental
+    en lugar de recontarse. Devuelve (total, top, tiempos) con los tiempos en segundos.
+    """
+    frecuencias_previas = estadisticas.letras if estadisticas is not None and estadisticas.total else None
+    etapa = EtapaFlujo(k, frecuencias_previas)
+    t0 = time.perf_counter()
+    siguiente_aviso = t0 + intervalo
+
+    candidatos = iterar_palabras(patron, min_counts, exact_counts, letras_descartadas, posiciones_prohibidas, indice.palabras)
+    for palabra in indice.marcar_en_flujo(candidatos):
+        etapa.consumir(palabra)
+        if al_progreso is not None and time.perf_counter() >= siguiente_aviso:
+            al_progreso(etapa.total, etapa.provisional())
+            siguiente_aviso = time.perf_counter() + intervalo
+    t1 = time.perf_counter()
+
+    frecuencias = etapa.frecuencias
+    if estadisticas is not None:
+        # Si la etapa ya contó las letras (no había frecuencias previas), se reutilizan
+        estadisticas.actualizar(indice.marcas, etapa.frecuencias if frecuencias_previas is None else None)
+        frecuencias = estadisticas.letras
+    top = mejores_palabras(indice.candidatos(), frecuencias, k) if etapa.total else []
+    t2 = time.perf_counter()
+    return etapa.total, top, {"filtro": t1 - t0, "ranking": t2 - t1}
+
+# --- NUEVO: Modo exacto para el final de la partida (ramificación y poda) ---
+LIMITE_EXACTO = 200
+EPSILON_EXACTO = 1e-9  # tolerancia para considerar empatados dos valores esperados
+
+class _LimiteAlcanzado(Exception):
+    pass
+
+class SolucionadorExacto:
+    """
+    Busca el intento que minimiza el número esperado de intentos hasta acertar (contando el
+    propio intento). En la raíz se consideran también palabras que no son candidatas (pueden
+    separar mejor a las candidatas aunque no puedan acertar); en los niveles inferiores se
+    elige entre los candidatos. Usa ramificación y poda con la cota inferior (2m - 1) / m para
+    un grupo de m candidatos y una tabla de transposición indexada por el conjunto de
+    candidatos, de modo que cada subproblema se resuelve una vez. Si se superan `limite_nodos`
+    o `limite_tiempo` segundos mientras se recorren las candidatas, `resolver` devuelve None.
+    """
+    def __init__(self, limite_nodos=200000, limite_tiempo=2.0):
+        self.limite_nodos = limite_nodos
+        self.limite_tiempo = limite_tiempo
+        self.tabla = {}   # frozenset de candidatos -> valor exacto
+        self.cotas = {}   # frozenset de candidatos -> cota inferior conocida
+        self._patrones = {}
+        self.nodos = 0
+
+    @staticmethod
+    def cota_grupo(m):
+        """ Con un grupo de m candidatos, lo mejor posible es acertar ya o en el siguiente intento. """
+        return (2 * m - 1) / m
+
+    def _patron(self, intento, solucion):
+        clave = (intento, solucion)
+        if clave not in self._patrones:
+            self._patrones[clave] = calcular_patron(intento, solucion)
+        return self._patrones[clave]
+
+    def _clases(self, intento, candidatos):
+        """ Grupos de candidatos que dan el mismo feedback (sin el del acierto). """
+        clases = defaultdict(list)
+        for solucion in candidatos:
+            if solucion != intento:
+                clases[self._patron(intento, solucion)].append(solucion)
+        return sorted(clases.values(), key=len, reverse=True)
+
+    @staticmethod
+    def _clases_fuera(intento, candidatos, max_colisiones):
+        """
+        Como `_clases` para un intento que no es candidato, sin guardar los patrones. Devuelve
+        None en cuanto hay `max_colisiones` candidatos que caen en una clase ya ocupada.
+        """
+        clases = defaultdict(list)
+        colisiones = 0
+        for solucion in candidatos:
+            patron = calcular_patron(intento, solucion)
+            if patron in clases:
+                colisiones += 1
+                if colisiones >= max_colisiones:
+                    return None
+            clases[patron].append(solucion)
+        return sorted(clases.values(), key=len, reverse=True)
+
+    def _mejor_fuera(self, candidatos, intentos, mejor_intento, mejor):
+        """
+        Prueba en la raíz los `intentos` que no son candidatos. Devuelve (mejor_intento, mejor,
+        completo), con `completo` False si se alcanzó el límite antes de probarlos todos.
+        """
+        n = len(candidatos)
+        # Sin poder acertar a la primera, lo mejor es 2 intentos: con k clases, el valor es
+        # al menos 3 - k / n, así que solo puede mejorar si hay menos de n * (mejor - 2) colisiones
+        if mejor <= 2:
+            return mejor_intento, mejor, True
+
+        # Primero los intentos con letras que parten mejor a los candidatos
+        frecuencias = dict(sugerir_letras(candidatos))
+        propios = set(candidatos)
+        intentos = sorted(
+            (p for p in intentos if p not in propios),
+            key=lambda p: (-sum(min(frecuencias.get(l, 0), n - frecuencias.get(l, 0)) for l in set(p)), p)
+        )
+        try:
+            for intento in intentos:
+                if time.perf_counter() > self._fin:
+                    raise _LimiteAlcanzado()
+                clases = self._clases_fuera(intento, candidatos, n * (mejor - 2))
+                if clases is None or 1 + sum(len(c) * self.cota_grupo(len(c)) for c in clases) / n >= mejor:
+                    continue
+                # Ante un empate se prefiere el candidato, que además puede acertar
+                valor = self._evaluar(intento, clases, n, mejor - EPSILON_EXACTO)
+                if valor < mejor - EPSILON_EXACTO:
+                    mejor_intento, mejor = intento, valor
+        except _LimiteAlcanzado:
+            return mejor_intento, mejor, False
+        return mejor_intento, mejor, True
+
+    def _evaluar(self, intento, clases, n, cota):
+        """
+        Valor esperado de `intento` sobre n candidatos. Es exacto si es menor que `cota`;
+        si no, devuelve una cota inferior >= `cota`.
+        """
+        # total = n * valor; se parte de la cota inferior y se va afinando grupo a grupo
+        total = n + sum(len(c) * self.cota_grupo(len(c)) for c in clases)
+        limite = cota * n
+        for clase in clases:
+            m = len(clase)
+            if total >= limite:
+                break
+            base = m * self.cota_grupo(m)
+            valor = self._valor(clase, (limite - (total - base)) / m)
+            total += m * valor - base
+        return total / n
+
+    def _valor(self, candidatos, cota):
+        n = len(candidatos)
+        if n <= 2:
+            return self.cota_grupo(n)
+
+        clave = frozenset(candidatos)
+        if clave in self.tabla:
+            return self.tabla[clave]
+        if self.cotas.get(clave, 0.0) >= cota:
+            return self.cotas[clave]
+
+        self.nodos += 1
+        if self.nodos > self.limite_nodos or time.perf_counter() > self._fin:
+            raise _LimiteAlcanzado()
+
+        # Primero los intentos más prometedores según su cota inferior
+        opciones = []
+        for intento in candidatos:
+            clases = self._clases(intento, candidatos)
+            cota_intento = 1 + sum(len(c) * self.cota_grupo(len(c)) for c in clases) / n
+            opciones.append((cota_intento, intento, clases))
+        opciones.sort(key=itemgetter(0, 1))
+
+        mejor = cota
+        for cota_intento, intento, clases in opciones:
+            if cota_intento >= mejor:
+                break
+            mejor = min(mejor, self._evaluar(intento, clases, n, mejor))
+
+        if mejor < cota:
+            self.tabla[clave] = mejor
+        else:
+            self.cotas[clave] = max(self.cotas.get(clave, 0.0), cota)
+        return mejor
+
+    def resolver(self, candidatos, intento_heuristico=None, intentos_extra=()):
+        """
+        Devuelve (mejor_intento, valor, valor_heuristico, completo) o None si se alcanza el
+        límite antes de terminar con las candidatas. `valor_heuristico` es el valor exacto de
+        `intento_heuristico` (None si no se indica). En caso de empate se prefiere
+        `intento_heuristico`. `intentos_extra` son las demás palabras que se pueden jugar
+        (p. ej. todo el diccionario); `completo` es False si el límite llegó antes de probarlas
+        todas, y entonces el resultado solo es óptimo entre las candidatas y las ya probadas.
+        """
+        candidatos = sorted(candidatos)
+        n = len(candidatos)
+        if n == 0:
+            return None
+        self._fin = time.perf_counter() + self.limite_tiempo
+        try:
+            mejor_intento, mejor = None, float("inf")
+            opciones = []
+            for intento in candidatos:
+                clases = self._clases(intento, candidatos)
+                opciones.append((1 + sum(len(c) * self.cota_grupo(len(c)) for c in clases) / n, intento, clases))
+            opciones.sort(key=itemgetter(0, 1))
+
+            valor_heuristico = None
+            for cota_intento, intento, clases in opciones:
+                if intento == intento_heuristico:
+                    # La sugerencia heurística se evalúa siempre sin poda para poder compararla
+                    valor_heuristico = self._evaluar(intento, clases, n, float("inf"))
+                    if valor_heuristico <= mejor + EPSILON_EXACTO:
+                        mejor_intento, mejor = intento, min(mejor, valor_heuristico)
+                elif cota_intento < mejor:
+                    valor = self._evaluar(intento, clases, n, mejor)
+                    if valor < mejor - (EPSILON_EXACTO if mejor_intento == intento_heuristico else 0.0):
+                        mejor_intento, mejor = intento, valor
+        except _LimiteAlcanzado:
+            return None
+        mejor_intento, mejor, completo = self._mejor_fuera(candidatos, intentos_extra, mejor_intento, mejor)
+        return mejor_intento, mejor, valor_heuristico, completo
+
+# --- NUEVO: Índice de prefijos para los conteos en vivo de cada fila ---
+class IndicePrefijos:
+    """
+    Array ordenado de las palabras de una misma longitud. Un prefijo corresponde a un
+    rango contiguo del array, que se estrecha letra a letra con búsquedas binarias.
+    """
+    def __init__(self, palabras):
+        self.palabras = sorted(set(palabras))
+        longitud = self.longitud = len(self.palabras[0]) if self.palabras else 0
+        # Una clave por posición, creadas una sola vez para no reservar memoria en cada tecla
+        self._claves = [itemgetter(i) for i in range(longitud)]
+        # marcas[i] = 1 si palabras[i] es candidata; acumulado[i] = candidatos entre palabras[0:i]
+        # (ambos None si aún no hay búsqueda)
+        self.marcas = None
+        self.acumulado = None
+
+    def rango(self, prefijo):
+        """ Devuelve (lo, hi) tal que palabras[lo:hi] son las palabras que empiezan por `prefijo`. """
+        lo, hi = 0, len(self.palabras)
+        for i in range(min(len(prefijo), len(self._claves))):
+            clave = self._claves[i]
+            lo = bisect_left(self.palabras, prefijo[i], lo, hi, key=clave)
+            hi = bisect_right(self.palabras, prefijo[i], lo, hi, key=clave)
+            if lo == hi:
+                break
+        if len(prefijo) > len(self._claves):
+            return lo, lo
+        return lo, hi
+
+    def contar(self, prefijo):
+        """ Devuelve (palabras del diccionario, candidatos actuales o None) con ese prefijo. """
+        lo, hi = self.rango(prefijo)
+        acumulado = self.acumulado
+        return hi - lo, (acumulado[hi] - acumulado[lo]) if acumulado is not None else None
+
+    def marcar_en_flujo(self, candidatos):
+        """
+        Generador que deja pasar los candidatos marcándolos. Al agotarse, sustituye las marcas
+        y los conteos acumulados de la búsqueda anterior.
+        """
+        marcas = bytearray(len(self.palabras))
+        for palabra in candidatos:
+            marcas[bisect_left(self.palabras, palabra)] = 1
+            yield palabra
+        self.marcas = marcas
+        self.acumulado = array('I', itertools.accumulate(marcas, initial=0))
+
+    def candidatos(self):
+        """ Itera los candidatos de la última búsqueda en orden alfabético. """
+        return itertools.compress(self.palabras, self.marcas or ())
+
+    def limpiar_candidatos(self):
+        self.marcas = None
+        self.acumulado = None
+
+# --- NUEVO: Frecuencias de letras y de letra por posición, actualizadas de forma incremental ---
+class EstadisticasLetras:
+    """
+    Frecuencias sobre los candidatos marcados en un IndicePrefijos: `letras` cuenta las
+    palabras que contienen cada letra (como `sugerir_letras`) y `posiciones[i]` las letras
+    en la posición i. Si los nuevos candidatos son un subconjunto de los anteriores solo se
+    restan las palabras eliminadas; si no, se recalcula todo.
+    """
+    def __init__(self, indice):
+        self.indice = indice
+        self.incremental = False  # si la última actualización solo restó palabras
+        self.limpiar()
+
+    def copia(self):
+        """ Copia independiente (comparte el índice), para repetir una actualización desde el mismo estado. """
+        otra = EstadisticasLetras(self.indice)
+        otra.total = self.total
+        otra.letras = self.letras.copy()
+        otra.posiciones = [contador.copy() for contador in self.posiciones]
+        otra._marcas = self._marcas
+        return otra
+
+    def limpiar(self):
+        self.total = 0
+        self.letras = Counter()
+        self.posiciones = [Counter() for _ in range(self.indice.longitud)]
+        self._marcas = 0  # candidatos actuales como máscara de bits (un byte 0/1 por palabra)
+
+    def instantanea(self):
+        """ Copia de solo lectura (total, letras, posiciones) para mostrarla desde otro hilo. """
+        return self.total, dict(self.letras), [dict(contador) for contador in self.posiciones]
+
+    def _aplicar(self, palabra, signo, contar_letras=True):
+        if contar_letras:
+            for letra in set(palabra):
+                self.letras[letra] += signo
+        for i, letra in enumerate(palabra):
+            self.posiciones[i][letra] += signo
+        self.total += signo
+
+    def actualizar(self, marcas, letras=None):
+        """
+        Aplica las nuevas marcas del índice. Devuelve el número de palabras procesadas.
+        `letras` son las frecuencias por letra ya contadas sobre esas mismas marcas; si hay
+        que recalcular todo se adoptan en lugar de volver a contarlas.
+        """
+        if marcas is None:
+            self.limpiar()
+            self.incremental = False
+            return 0
+
+        # Las comparaciones y diferencias de conjuntos se hacen con enteros (en C);
+        # en Python solo se recorren las palabras que cambian.
+        nuevas = int.from_bytes(marcas, "little")
+        self.incremental = bool(self._marcas) and nuevas & self._marcas == nuevas
+        if self.incremental:
+            cambios, signo = self._marcas & ~nuevas, -1
+        else:
+            self.limpiar()
+            cambios, signo = nuevas, 1
+            if letras is not None:
+                self.letras = letras
+        self._marcas = nuevas
+        contar_letras = self.incremental or letras is None
+
+        cambios = cambios.to_bytes(len(marcas), "little")
+        procesadas = 0
+        i = cambios.find(1)
+        while i != -1:
+            self._aplicar(self.indice.palabras[i], signo, contar_letras)
+            procesadas += 1
+            i = cambios.find(1, i + 1)
+        return procesadas
+
+# --- NUEVO: Trazas de sesión (JSONL) para reproducir búsquedas reales ---
+# Versión 2: `incremental` indica si las frecuencias se actualizaron restando palabras.
+# Versión 3: `salida.exacto` guarda el resultado del modo exacto y `tiempos.exacto` su duración.
+# Solo se comparan latencias entre registros de la versión actual.
+TRAZAS_VERSION = 3
+
+def serializar_busqueda(filas, patron, min_counts, exact_counts, letras_descartadas, posiciones_prohibidas, palabras, top, tiempos, incremental=False, exacto=None):
+    """
+    Convierte una búsqueda (entradas, salidas y tiempos) en un registro JSON compacto.
+    `exacto` es lo que devolvió `SolucionadorExacto.resolver`, "limite" o None si no se ejecutó.
+    """
+    return {
+        "v": TRAZAS_VERSION,
+        "t": round(time.time(), 3),
+        "parrilla": filas,
+        "entrada": {
+            "patron": patron,
+            "min": dict(min_counts),
+            "exact": dict(exact_counts),
+            "descartadas": sorted(letras_descartadas),
+            "prohibidas": {letra: sorted(pos) for letra, pos in posiciones_prohibidas.items()},
+        },
+        "salida": {"palabras": sorted(palabras), "top": top, "exacto": list(exacto) if isinstance(exacto, tuple) else exacto},
+        "tiempos": tiempos,
+        "incremental": incremental,
+    }
+
+def deserializar_entrada(entrada):
+    """ Reconstruye los argumentos de `generar_palabras` (sin el diccionario) a partir de un registro. """
+    return (
+        entrada["patron"],
+        Counter(entrada["min"]),
+        dict(entrada["exact"]),
+        set(entrada["descartadas"]),
+        defaultdict(set, {letra: set(pos) for letra, pos in entrada["prohibidas"].items()}),
+    )
+
+class RegistroTrazas:
+    """ Añade un registro JSONL por búsqueda al fichero de la sesión. """
+    def __init__(self, ruta):
+        self.ruta = ruta
+        os.makedirs(os.path.dirname(ruta) or ".", exist_ok=True)
+
+    def escribir(self, registro):
+        with open(self.ruta, "a", encoding="utf-8") as f:
+            f.write(json.dumps(registro, ensure_ascii=False, separators=(",", ":")) + "\n")
@@ -0,0 +1,340 @@
+"""
+Busca sin interfaz la pareja de palabras de apertura cuyo feedback combinado divide
+mejor el diccionario (menor número esperado de candidatas tras los dos intentos).
+
+Por defecto solo se consideran las `--candidatos` palabras preseleccionadas por frecuencia
+de letras y valor individual, así que el resultado es óptimo solo entre ellas. Con
+`--candidatos 0` se recorren todas las parejas de la longitud (búsqueda exhaustiva, lenta).
+
+Uso:
+    python optimizar_apertura.py --longitud 5 --candidatos 300 --top 10
+    python optimizar_apertura.py --candidatos 0              # exhaustiva
+    python optimizar_apertura.py --solo-disjuntas --procesos 8 --checkpoint apertura_5.json
+
+No necesita Tkinter ni pantalla. Por defecto usa 'palabras.json' de la carpeta actual (ver --diccionario).
+La búsqueda guarda su progreso en el fichero de checkpoint y, si se relanza con la misma
+configuración, continúa donde lo dejó. Las filas de feedback se guardan junto a él
+(mismo nombre con extensión .filas) para no recalcularlas al reanudar.
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from array import array
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from heapq import heappush, heapreplace
+
+import motor_wordle as motor
+
+# Estado compartido por cada proceso trabajador (se fija una vez en `_iniciar_filas` o `_iniciar_trabajador`)
+_SOLUCIONES = None
+_TIPO = None
+_FILAS = None
+_GRUPOS = None
+_LETRAS = None
+_SOLO_DISJUNTAS = False
+
+
+def valor_esperado(tamanos, total):
+    """ Número esperado de candidatas que quedan: sum(s^2) / N. """
+    return sum(s * s for s in tamanos) / total
+
+
+def agrupar(fila):
+    """
+    Índices de las soluciones ordenados por clase de feedback, de la clase más grande a la
+    más pequeña, y dónde termina cada clase con más de una solución. Devuelve (orden, cortes).
+    """
+    tipo = "H" if len(fila) <= 256 ** array("H").itemsize else "L"
+    clases = {}
+    for indice, codigo in enumerate(fila):
+        clases.setdefault(codigo, []).append(indice)
+    orden, cortes = array(tipo), array(tipo)
+    for clase in sorted(clases.values(), key=len, reverse=True):
+        orden.extend(clase)
+        if len(clase) > 1:
+            cortes.append(len(orden))
+    return orden, cortes
+
+
+def _iniciar_filas(soluciones, tipo):
+    global _SOLUCIONES, _TIPO
+    _SOLUCIONES = soluciones
+    _TIPO = tipo
+
+
+def calcular_fila(palabra):
+    """ Feedback de `palabra` frente a cada solución, como array compacto. """
+    return array(_TIPO, (motor.calcular_patron(palabra, s) for s in _SOLUCIONES))
+
+
+def cargar_filas(ruta, clave):
+    """
+    Devuelve (candidatas, filas, esperados) guardados en `ruta` si corresponden a la misma
+    clave, o None. El fichero es una cabecera JSON en la primera línea seguida de las filas en binario.
+    """
+    if not ruta or not os.path.exists(ruta):
+        return None
+    with open(ruta, "rb") as f:
+        cabecera = json.loads(f.readline())
+        if cabecera.get("clave") != clave:
+            return None
+        datos = array(cabecera["tipo"])
+        datos.fromfile(f, len(cabecera["candidatas"]) * clave["soluciones"])
+    total = clave["soluciones"]
+    filas = [datos[n * total:(n + 1) * total] for n in range(len(cabecera["candidatas"]))]
+    return cabecera["candidatas"], filas, cabecera["esperados"]
+
+
+def guardar_filas(ruta, clave, candidatas, filas, esperados):
+    """ Escribe las filas de forma atómica, igual que el checkpoint. """
+    temporal = ruta + ".tmp"
+    tipo = filas[0].typecode if filas else "B"
+    with open(temporal, "wb") as f:
+        cabecera = {"clave": clave, "tipo": tipo, "candidatas": candidatas, "esperados": esperados}
+        f.write(json.dumps(cabecera, ensure_ascii=False).encode("utf-8") + b"\n")
+        for fila in filas:
+            fila.tofile(f)
+    os.replace(temporal, ruta)
+
+
+def preparar(diccionario, longitud, num_candidatos, procesos=1, ruta_filas=None):
+    """
+    Preselecciona las palabras de apertura (todas si `num_candidatos` es 0) y calcula en paralelo
+    su fila de feedback frente a todas las soluciones, o la lee de `ruta_filas` si ya se calculó
+    con el mismo diccionario. Devuelve (soluciones, candidatas, filas, grupos, esperados, de_cache),
+    donde `grupos` son las clases de cada palabra tal como las devuelve `agrupar`.
+    """
+    soluciones = sorted({p for p in diccionario if len(p) == longitud})
+    total = len(soluciones)
+    num_patrones = 3 ** longitud
+    # El tipo más pequeño en el que caben todos los códigos de feedback (0 .. 3^longitud - 1)
+    tipo = next(t for t in "BHLQ" if num_patrones <= 256 ** array(t).itemsize)
+    clave = {
+        "longitud": longitud,
+        "soluciones": total,
+        "huella": hashlib.sha1("\n".join(soluciones).encode("utf-8")).hexdigest(),
+        "candidatos": num_candidatos,
+    }
+
+    with ProcessPoolExecutor(max_workers=procesos, initializer=_iniciar_filas, initargs=(soluciones, tipo)) as ejecutor:
+        guardadas = cargar_filas(ruta_filas, clave)
+        if guardadas:
+            candidatas, filas, esperados = guardadas
+        else:
+            # Poda heurística: solo se evalúan las palabras con mejor puntuación por frecuencia de letras
+            if num_candidatos > 0:
+                frecuencias = dict(motor.sugerir_letras(soluciones))
+                preseleccion = motor.mejores_palabras(soluciones, frecuencias, k=num_candidatos * 4)
+            else:
+                preseleccion = soluciones
+
+            bloque = max(1, len(preseleccion) // (procesos * 4))
+            evaluadas = [
+                (valor_esperado(Counter(fila).values(), total), palabra, fila)
+                for palabra, fila in zip(preseleccion, ejecutor.map(calcular_fila, preseleccion, chunksize=bloque))
+            ]
+            evaluadas.sort(key=lambda e: (e[0], e[1]))
+            if num_candidatos > 0:
+                evaluadas = evaluadas[:num_candidatos]
+
+            candidatas = [e[1] for e in evaluadas]
+            filas = [e[2] for e in evaluadas]
+            esperados = [e[0] for e in evaluadas]
+            if ruta_filas and filas:
+                guardar_filas(ruta_filas, clave, candidatas, filas, esperados)
+
+        bloque = max(1, len(filas) // (procesos * 4))
+        grupos = list(ejecutor.map(agrupar, filas, chunksize=bloque))
+    return soluciones, candidatas, filas, grupos, esperados, guardadas is not None
+
+
+def _iniciar_trabajador(filas, grupos, candidatas, solo_disjuntas):
+    global _FILAS, _GRUPOS, _LETRAS, _SOLO_DISJUNTAS
+    _FILAS = filas
+    _GRUPOS = grupos
+    _LETRAS = [frozenset(palabra) for palabra in candidatas]
+    _SOLO_DISJUNTAS = solo_disjuntas
+
+
+def evaluar_pareja(orden_i, cortes_i, fila_j, limite):
+    """
+    Suma de cuadrados de las clases de la pareja, partiendo cada clase de i según el feedback
+    de j, de la más grande a la más pequeña. Lo que queda por repartir aporta al menos una
+    unidad por solución (todas distinguidas), así que en cuanto lo acumulado más lo pendiente
+    alcanza `limite` la pareja no puede entrar en el top y se abandona. Devuelve
+    (suma, num_clases), o None si se abandonó.
+    """
+    total = len(orden_i)
+    suma = num_clases = inicio = 0
+    for fin in cortes_i:
+        partes = Counter(map(fila_j.__getitem__, orden_i[inicio:fin])).values()
+        suma += sum(s * s for s in partes)
+        num_clases += len(partes)
+        inicio = fin
+        if suma + total - fin > limite:
+            return None
+    # El resto son clases de una sola solución
+    return suma + total - inicio, num_clases + total - inicio
+
+
+def evaluar_fila(i, umbral, k):
+    """
+    Evalúa las parejas (i, j) con j > i. Devuelve (i, mejores, evaluadas, podadas), donde
+    `mejores` son como mucho k tuplas (esperado, num_clases, i, j) y `podadas` cuenta las
+    parejas descartadas sin terminar de evaluarlas.
+    """
+    orden_i, cortes_i = _GRUPOS[i]
+    total = len(orden_i)
+    mejores = []
+    evaluadas = podadas = 0
+
+    for j in range(i + 1, len(_FILAS)):
+        if _SOLO_DISJUNTAS and not _LETRAS[i].isdisjoint(_LETRAS[j]):
+            continue
+
+        evaluadas += 1
+        resultado = evaluar_pareja(orden_i, cortes_i, _FILAS[j], umbral * total)
+        if resultado is None:
+            podadas += 1
+            continue
+        suma, num_clases = resultado
+        esperado = suma / total
+
+        entrada = (-esperado, num_clases, i, j)
+        if len(mejores) < k:
+            heappush(mejores, entrada)
+        elif entrada > mejores[0]:
+            heapreplace(mejores, entrada)
+        if len(mejores) == k:
+            umbral = min(umbral, -mejores[0][0])
+
+    return i, [(-e, n, a, b) for e, n, a, b in mejores], evaluadas, podadas
+
+
+def cargar_checkpoint(ruta, configuracion):
+    """ Devuelve (filas_hechas, mejores) si el checkpoint corresponde a la misma configuración. """
+    if not ruta or not os.path.exists(ruta):
+        return set(), []
+    with open(ruta, encoding="utf-8") as f:
+        datos = json.load(f)
+    if datos.get("configuracion") != configuracion:
+        print(f"⚠️ El checkpoint '{ruta}' es de otra configuración; se empieza desde cero.")
+        return set(), []
+    return set(datos["hechas"]), [tuple(m) for m in datos["mejores"]]
+
+
+def guardar_checkpoint(ruta, configuracion, hechas, mejores):
+    """ Escribe el checkpoint de forma atómica para no corromperlo si se interrumpe. """
+    temporal = ruta + ".tmp"
+    with open(temporal, "w", encoding="utf-8") as f:
+        json.dump({"configuracion": configuracion, "hechas": sorted(hechas), "mejores": mejores}, f, ensure_ascii=False)
+    os.replace(temporal, ruta)
+
+
+def optimizar(candidatas, filas, grupos, top, procesos, solo_disjuntas, ruta_checkpoint, configuracion, intervalo_guardado=30.0):
+    """ Recorre las filas de parejas en paralelo, abandonando las que no pueden entrar en el top. Devuelve las `top` mejores parejas. """
+    hechas, mejores = cargar_checkpoint(ruta_checkpoint, configuracion)
+    if hechas:
+        print(f"↩️ Reanudando: {len(hechas)} de {len(candidatas)} filas ya evaluadas.")
+
+    def umbral_actual():
+        return mejores[top - 1][0] if len(mejores) >= top else float("inf")
+
+    pendientes = [i for i in range(len(candidatas)) if i not in hechas]
+    evaluadas_total = podadas_total = 0
+    ultimo_guardado = time.monotonic()
+
+    with ProcessPoolExecutor(max_workers=procesos, initializer=_iniciar_trabajador,
+                             initargs=(filas, grupos, candidatas, solo_disjuntas)) as ejecutor:
+        en_curso = set()
+        siguiente = 0
+        while siguiente < len(pendientes) or en_curso:
+            # Mantener la cola llena; cada fila parte del umbral conocido al enviarla
+            while siguiente < len(pendientes) and len(en_curso) < procesos * 2:
+                i = pendientes[siguiente]
+                siguiente += 1
+                en_curso.add(ejecutor.submit(evaluar_fila, i, umbral_actual(), top))
+
+            if not en_curso:
+                break
+            terminados, en_curso = wait(en_curso, return_when=FIRST_COMPLETED)
+            for futuro in terminados:
+                i, nuevas, evaluadas, podadas = futuro.result()
+                hechas.add(i)
+                evaluadas_total += evaluadas
+                podadas_total += podadas
+                for esperado, num_clases, a, b in nuevas:
+                    mejores.append((esperado, num_clases, candidatas[a], candidatas[b]))
+                mejores.sort(key=lambda m: (m[0], -m[1]))
+                del mejores[top:]
+
+            if ruta_checkpoint and time.monotonic() - ultimo_guardado >= intervalo_guardado:
+                guardar_checkpoint(ruta_checkpoint, configuracion, hechas, mejores)
+                ultimo_guardado = time.monotonic()
+                print(f"  💾 {len(hechas)}/{len(candidatas)} filas · mejor {mejores[0][0]:.3f}" if mejores else
+                      f"  💾 {len(hechas)}/{len(candidatas)} filas")
+
+    if ruta_checkpoint:
+        guardar_checkpoint(ruta_checkpoint, configuracion, hechas, mejores)
+    porcentaje = podadas_total / evaluadas_total * 100 if evaluadas_total else 0.0
+    print(f"🔢 Parejas evaluadas: {evaluadas_total} · abandonadas antes de terminar: {podadas_total} ({porcentaje:.1f}%)")
+    return mejores
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Optimizador de la pareja de palabras de apertura.")
+    parser.add_argument("--longitud", type=int, default=5, help="Longitud de las palabras")
+    parser.add_argument("--candidatos", type=int, default=300, help="Palabras de apertura a considerar, preseleccionadas por frecuencia de letras y valor "
+                             "individual; el resultado solo es óptimo entre ellas (0 = todas, búsqueda exhaustiva)")
+    parser.add_argument("--top", type=int, default=10, help="Número de parejas a mostrar")
+    parser.add_argument("--procesos", type=int, default=os.cpu_count() or 1, help="Procesos en paralelo")
+    parser.add_argument("--solo-disjuntas", action="store_true", help="Solo parejas sin letras en común (heurística)")
+    parser.add_argument("--checkpoint", help="Fichero de checkpoint (por defecto apertura_<longitud>.json)")
+    parser.add_argument("--diccionario", default="palabras.json", help="Ruta del diccionario (por defecto 'palabras.json')")
+    opciones = parser.parse_args(argv)
+    if opciones.top < 1:
+        parser.error("--top debe ser al menos 1")
+
+    try:
+        diccionario = motor.cargar_diccionario(opciones.diccionario)
+    except FileNotFoundError:
+        print(f"❌ No se encontró el diccionario '{opciones.diccionario}'.")
+        return 1
+
+    t0 = time.perf_counter()
+    procesos = max(1, opciones.procesos)
+    ruta_checkpoint = opciones.checkpoint or f"apertura_{opciones.longitud}.json"
+    ruta_filas = os.path.splitext(ruta_checkpoint)[0] + ".filas"
+    soluciones, candidatas, filas, grupos, esperados, de_cache = preparar(
+        diccionario, opciones.longitud, opciones.candidatos, procesos, ruta_filas
+    )
+    if not soluciones:
+        print(f"❌ No hay palabras de longitud {opciones.longitud} en el diccionario.")
+        return 1
+    alcance = "todas" if opciones.candidatos <= 0 else "preseleccionadas; óptimo solo entre ellas"
+    print(f"📖 {len(soluciones)} soluciones · {len(candidatas)} palabras de apertura ({alcance}) "
+          f"(mejor individual: {candidatas[0].upper()} → {esperados[0]:.2f}) · {time.perf_counter() - t0:.1f} s"
+          + (f" (filas leídas de '{ruta_filas}')" if de_cache else ""))
+
+    configuracion = {
+        "longitud": opciones.longitud,
+        "soluciones": len(soluciones),
+        "candidatas": candidatas,
+        "solo_disjuntas": opciones.solo_disjuntas,
+        "top": opciones.top,
+    }
+    mejores = optimizar(candidatas, filas, grupos, opciones.top, procesos,
+                        opciones.solo_disjuntas, ruta_checkpoint, configuracion)
+
+    print(f"🏆 MEJORES PAREJAS ({time.perf_counter() - t0:.1f} s):")
+    for posicion, (esperado, num_clases, a, b) in enumerate(mejores, 1):
+        print(f"  {posicion:>2}. {a.upper()} + {b.upper()}  → {esperado:.3f} candidatas esperadas ({num_clases} grupos)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,180 @@
+"""
+Reproduce sin interfaz las trazas JSONL grabadas por la aplicación y las compara
+con el núcleo de búsqueda actual.
+
+Uso:
+    python reproducir_trazas.py trazas/                 # todas las trazas de la carpeta
+    python reproducir_trazas.py sesion_1.jsonl sesion_2.jsonl --repeticiones 3
+
+No necesita Tkinter ni pantalla. Por defecto usa 'palabras.json' de la carpeta actual (ver --diccionario).
+Devuelve código de salida 1 si alguna búsqueda produce candidatos distintos a los grabados.
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+from statistics import mean, median
+
+import motor_wordle as motor
+
+FASES = ("filtro", "ranking", "exacto")
+
+
+def listar_trazas(rutas):
+    """ Expande carpetas y patrones a la lista de ficheros .jsonl a reproducir. """
+    ficheros = []
+    for ruta in rutas:
+        if os.path.isdir(ruta):
+            ficheros.extend(sorted(glob.glob(os.path.join(ruta, "**", "*.jsonl"), recursive=True)))
+        else:
+            ficheros.extend(sorted(glob.glob(ruta)) or [ruta])
+    return ficheros
+
+
+def leer_registros(fichero):
+    with open(fichero, encoding="utf-8") as f:
+        for num_linea, linea in enumerate(f, 1):
+            linea = linea.strip()
+            if linea:
+                yield num_linea, json.loads(linea)
+
+
+def reproducir(registro, diccionario, indices_por_longitud, estadisticas_por_longitud, repeticiones):
+    """
+    Ejecuta de nuevo una búsqueda grabada con el mismo flujo que la aplicación, incluidas las
+    frecuencias incrementales, que se conservan entre los registros de un mismo fichero, y el
+    modo exacto cuando hay entre 2 y LIMITE_EXACTO candidatos.
+    Devuelve (palabras, top, exacto, tiempos_ms, mismo_camino); `exacto` es lo que devolvería
+    la app (None si no se ejecuta) y `mismo_camino` es False si las frecuencias no se
+    actualizaron igual que al grabar (incremental o completa).
+    """
+    args = motor.deserializar_entrada(registro["entrada"])
+    longitud = len(args[0])
+    if longitud not in indices_por_longitud:
+        indices_por_longitud[longitud] = motor.IndicePrefijos(p for p in diccionario if len(p) == longitud)
+    indice = indices_por_longitud[longitud]
+    if longitud not in estadisticas_por_longitud:
+        estadisticas_por_longitud[longitud] = motor.EstadisticasLetras(indice)
+
+    # Si la app recalculó todo (p. ej. tras limpiar la parrilla), se parte también de cero
+    incremental = registro.get("incremental", False)
+    estado = estadisticas_por_longitud[longitud]
+    if not incremental:
+        estado.limpiar()
+
+    # Nos quedamos con el mejor tiempo de cada fase para reducir el ruido;
+    # cada repetición parte del mismo estado de las frecuencias
+    tiempos = {}
+    for _ in range(repeticiones):
+        estadisticas = estado.copia()
+        total, top, tiempos_flujo = motor.buscar_en_flujo(*args, indice, estadisticas=estadisticas)
+
+        exacto = None
+        if 1 < total <= motor.LIMITE_EXACTO:
+            t0 = time.perf_counter()
+            exacto = motor.SolucionadorExacto().resolver(
+                indice.candidatos(), top[0] if top else None, indice.palabras
+            ) or "limite"
+            tiempos_flujo["exacto"] = time.perf_counter() - t0
+
+        for fase, segundos in tiempos_flujo.items():
+            tiempos[fase] = min(tiempos.get(fase, float("inf")), segundos * 1000)
+    estadisticas_por_longitud[longitud] = estadisticas
+    return list(indice.candidatos()), top, exacto, tiempos, estadisticas.incremental == incremental
+
+
+def exacto_comparable(exacto):
+    """ Solo se comparan resultados exactos que revisaron todo el diccionario sin llegar al límite. """
+    return isinstance(exacto, (list, tuple)) and exacto[3]
+
+
+def describir_divergencia(grabadas, actuales):
+    grabadas, actuales = set(grabadas), set(actuales)
+    faltan = sorted(grabadas - actuales)
+    sobran = sorted(actuales - grabadas)
+    return f"faltan {len(faltan)} {faltan[:5]}, sobran {len(sobran)} {sobran[:5]}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Reproduce trazas de sesión y detecta regresiones de corrección y rendimiento.")
+    parser.add_argument("rutas", nargs="+", help="Ficheros .jsonl, patrones glob o carpetas con trazas")
+    parser.add_argument("--diccionario", default="palabras.json", help="Ruta del diccionario (por defecto 'palabras.json')")
+    parser.add_argument("--repeticiones", type=int, default=1, help="Repeticiones por búsqueda (se usa el mejor tiempo)")
+    parser.add_argument("--max-divergencias", type=int, default=20, help="Número máximo de divergencias a mostrar")
+    opciones = parser.parse_args(argv)
+
+    try:
+        diccionario = motor.cargar_diccionario(opciones.diccionario)
+    except FileNotFoundError:
+        print(f"❌ No se encontró el diccionario '{opciones.diccionario}'.")
+        return 1
+
+    indices_por_longitud = {}
+    grabados = defaultdict(list)
+    actuales = defaultdict(list)
+    divergencias = []
+    total = 0
+    sin_tiempos = 0
+    exactos_sin_comparar = 0
+
+    for fichero in listar_trazas(opciones.rutas):
+        # Cada fichero es una sesión: las frecuencias incrementales empiezan de cero
+        estadisticas_por_longitud = {}
+        for num_linea, registro in leer_registros(fichero):
+            total += 1
+            palabras, top, exacto, tiempos, mismo_camino = reproducir(
+                registro, diccionario, indices_por_longitud, estadisticas_por_longitud, max(1, opciones.repeticiones)
+            )
+            salida = registro["salida"]
+
+            if sorted(palabras) != salida["palabras"]:
+                divergencias.append(f"{fichero}:{num_linea} candidatos: {describir_divergencia(salida['palabras'], palabras)}")
+            elif top != salida["top"]:
+                divergencias.append(f"{fichero}:{num_linea} top: grabado {salida['top']} / actual {top}")
+            elif "exacto" in salida:
+                grabado = salida["exacto"]
+                if not (exacto_comparable(grabado) and exacto_comparable(exacto)):
+                    exactos_sin_comparar += grabado is not None or exacto is not None
+                elif grabado[0] != exacto[0] or abs(grabado[1] - exacto[1]) > motor.EPSILON_EXACTO:
+                    divergencias.append(f"{fichero}:{num_linea} exacto: grabado {grabado[0]} ({grabado[1]:.3f}) / "
+                                        f"actual {exacto[0]} ({exacto[1]:.3f})")
+
+            # Los tiempos de otras versiones de traza no miden el mismo trabajo
+            if registro.get("v") != motor.TRAZAS_VERSION or not mismo_camino:
+                sin_tiempos += 1
+                continue
+            for fase in FASES:
+                if fase in registro.get("tiempos", {}) and fase in tiempos:
+                    grabados[fase].append(registro["tiempos"][fase])
+                    actuales[fase].append(tiempos[fase])
+
+    print(f"🔁 Búsquedas reproducidas: {total}")
+    if sin_tiempos:
+        print(f"  ⚠️ {sin_tiempos} registros de otra versión de traza o con otro camino de actualización "
+              "de frecuencias: se comprueban los resultados pero no los tiempos")
+    if exactos_sin_comparar:
+        print(f"  ⚠️ {exactos_sin_comparar} resultados del modo exacto no se comparan porque alcanzaron el "
+              "límite de cálculo al grabar o al reproducir")
+    for fase in FASES:
+        if not actuales[fase]:
+            continue
+        antes, ahora = mean(grabados[fase]), mean(actuales[fase])
+        delta = (ahora - antes) / antes * 100 if antes else 0.0
+        print(f"  {fase:<8} grabado {antes:9.3f} ms  actual {ahora:9.3f} ms  "
+              f"(mediana {median(grabados[fase]):.3f} → {median(actuales[fase]):.3f} ms)  Δ {delta:+.1f}%")
+
+    if divergencias:
+        print(f"❌ {len(divergencias)} búsquedas divergen de lo grabado:")
+        for linea in divergencias[:opciones.max_divergencias]:
+            print(f"  - {linea}")
+        return 1
+
+    print("✅ Todas las búsquedas coinciden con lo grabado.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
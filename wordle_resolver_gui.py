@@ -1,13 +1,20 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 import json
-import itertools
 from collections import Counter, defaultdict
+from operator import itemgetter
 import threading
 import os
 import sys
 import webbrowser
 import urllib.request
+import time
+from datetime import datetime
+
+from motor_wordle import (
+    cargar_diccionario, buscar_en_flujo, IndicePrefijos, EstadisticasLetras,
+    SolucionadorExacto, LIMITE_EXACTO, EPSILON_EXACTO, serializar_busqueda, RegistroTrazas,
+)
 
 # --- NUEVO: Añadir versión a la aplicación ---
 __version__ = "1.0.1"
@@ -22,89 +29,17 @@ def resource_path(relative_path):
 
 # --- Carga de Diccionario ---
 try:
-    with open(resource_path("palabras.json"), encoding="utf-8") as f:
-        diccionario_es = json.load(f)
+    diccionario_es = cargar_diccionario(resource_path("palabras.json"))
 except FileNotFoundError:
     messagebox.showerror("Error Crítico", "No se encontró el archivo 'palabras.json'. La aplicación no puede funcionar sin él.")
     diccionario_es = []
 
-# --- Lógica de Búsqueda (sin cambios en su núcleo) ---
-def generar_palabras(patron, min_counts, exact_counts, letras_descartadas, posiciones_prohibidas, diccionario):
-    longitud = len(patron)
-    palabras_posibles = []
-
-    for palabra in diccionario: # Asumimos que el diccionario ya está pre-filtrado por longitud
-        
-        # Optimización: si una letra descartada no tiene reglas de conteo, la palabra no puede contenerla.
-        # Las letras con reglas de conteo (ej. exact_count=1) se manejan más adelante.
-        if any(letra in palabra for letra in letras_descartadas if letra not in exact_counts):
-            continue
-
-        palabra_valida = True
-        palabra_counter = Counter(palabra)
-
-        # Iteramos de una vez para aplicar todas las reglas a la palabra candidata
-        for i in range(longitud):
-            # 1. Comprobar patrón (letras verdes)
-            if patron[i] != '_' and patron[i] != palabra[i]:
-                palabra_valida = False
-                break
-            
-            # 2. Comprobar posiciones prohibidas (letras amarillas)
-            letra_actual = palabra[i]
-            if letra_actual in posiciones_prohibidas and i in posiciones_prohibidas[letra_actual]:
-                palabra_valida = False
-                break
-
-        if not palabra_valida: continue
-
-        # 3. Comprobar conteo de letras (la lógica clave)
-        # Combina todas las letras que tienen alguna restricción
-        todas_letras_restringidas = set(min_counts.keys()) | set(exact_counts.keys()) | letras_descartadas
-        
-        for letra in todas_letras_restringidas:
-            # La regla de conteo exacto tiene la máxima prioridad
-            if letra in exact_counts:
-                if palabra_counter[letra] != exact_counts[letra]:
-                    palabra_valida = False
-                    break
-            # Si no hay regla exacta, usamos la regla de conteo mínimo
-            elif letra in min_counts:
-                if palabra_counter[letra] < min_counts[letra]:
-                    palabra_valida = False
-                    break
-            # Si no hay reglas de conteo, es una letra descartada simple
-            elif letra in letras_descartadas:
-                if palabra_counter[letra] > 0:
-                    palabra_valida = False
-                    break
-        
-        if not palabra_valida: continue
-
-        # Si la palabra ha superado todos los filtros, es una candidata válida
-        palabras_posibles.append(palabra)
-
-    return palabras_posibles
-
-def sugerir_letras(palabras):
-    contador = Counter()
-    for palabra in palabras:
-        contador.update(set(palabra))
-    return contador.most_common()
-
-def mejores_palabras(palabras, letras_mas_frecuentes):
-    ranking = []
-    for palabra in palabras:
-        letras_unicas = set(palabra)
-        score = len(letras_unicas)
-        frecuencia = sum(letras_mas_frecuentes.get(l, 0) for l in letras_unicas)
-        ranking.append((frecuencia, score, palabra))
-    ranking.sort(reverse=True)
-    return [p for _, _, p in ranking[:10]]
-
 # --- Clase principal de la aplicación ---
 # --- Clase principal de la aplicación ---
 class WordleSolverApp:
+    # NUEVO: Filas del teclado en pantalla
+    TECLADO_FILAS = ("qwertyuiop", "asdfghjklñ", "zxcvbnm")
+
     def __init__(self, root):
         self.root = root
         self.root.title("Wordle Solver en Español (UI Mejorada)")
@@ -134,6 +69,21 @@ class WordleSolverApp:
         self.grid_cells = []
         self.palabra_longitud = 5
         self.num_intentos = 6
+
+        # NUEVO: Grabación opcional de la sesión en trazas JSONL
+        self.grabar_var = tk.BooleanVar(value=False)
+        self.registro_trazas = None
+
+        # NUEVO: Índice de prefijos del diccionario para la longitud actual
+        self.indice = IndicePrefijos(p for p in diccionario_es if len(p) == self.palabra_longitud)
+        self.row_labels = []
+
+        # NUEVO: Frecuencias incrementales y teclado en pantalla
+        self.estadisticas = EstadisticasLetras(self.indice)
+        # Las estadísticas se modifican en el hilo de búsqueda; el teclado solo lee esta copia,
+        # que se sustituye en el hilo principal al terminar cada búsqueda
+        self.estadisticas_teclado = None
+        self.teclas = {}
         
         self.create_widgets()
         self.update_grid_colors()
@@ -173,13 +123,22 @@ class WordleSolverApp:
         self.reset_button = ttk.Button(top_buttons_frame, text="🧹 Limpiar", command=self.reset_grid)
         self.reset_button.grid(row=0, column=1, padx=5, sticky="ew")
 
+        # NUEVO: Casilla para grabar la sesión en una traza
+        self.grabar_check = ttk.Checkbutton(top_buttons_frame, text="⏺ Grabar sesión (traza JSONL)", variable=self.grabar_var, command=self.on_toggle_grabacion)
+        self.grabar_check.grid(row=1, column=0, columnspan=2, pady=(10, 0), sticky="w")
+
         self.grid_frame = ttk.Frame(control_frame)
         self.grid_frame.grid(row=1, column=0, sticky="n")
         self.create_wordle_grid()
+
+        # NUEVO: Teclado con el estado de cada letra y un mapa de calor de frecuencias
+        self.teclado_frame = ttk.Frame(control_frame)
+        self.teclado_frame.grid(row=2, column=0, sticky="n", pady=(15, 0))
+        self.create_keyboard()
         
         # MODIFICADO: Texto de ayuda actualizado
         self.spinner_label = ttk.Label(control_frame, text="✨ Escribe un intento. Haz clic derecho en una letra para cambiar su estado (gris/amarillo/verde).", anchor="center", wraplength=350)
-        self.spinner_label.grid(row=2, column=0, sticky="ew", pady=(20, 0))
+        self.spinner_label.grid(row=3, column=0, sticky="ew", pady=(20, 0))
         
         self.configure_styles()
 
@@ -195,6 +154,7 @@ class WordleSolverApp:
         validate_cmd = self.root.register(lambda text: len(text) <= 1)
         
         self.grid_cells = []
+        self.row_labels = []
         for r in range(self.num_intentos):
             row_list = []
             self.grid_frame.grid_rowconfigure(r, weight=1)
@@ -217,6 +177,61 @@ class WordleSolverApp:
             
             self.grid_cells.append(row_list)
 
+            # NUEVO: Conteo en vivo de palabras que encajan con lo escrito en la fila
+            row_label = ttk.Label(self.grid_frame, text="", width=18, anchor="w")
+            row_label.grid(row=r, column=self.palabra_longitud, padx=(10, 0), sticky="w")
+            self.row_labels.append(row_label)
+
+    def create_keyboard(self):
+        self.teclas = {}
+        for r, fila in enumerate(self.TECLADO_FILAS):
+            fila_frame = ttk.Frame(self.teclado_frame)
+            fila_frame.grid(row=r, column=0, pady=1)
+            for c, letra in enumerate(fila):
+                tecla = tk.Label(fila_frame, text=letra.upper(), width=3, font=("Segoe UI", 11, "bold"), relief="flat", pady=4)
+                tecla.grid(row=0, column=c, padx=1)
+                self.teclas[letra] = tecla
+
+        self.posiciones_label = ttk.Label(self.teclado_frame, text="", anchor="center", font=("Consolas", 10))
+        self.posiciones_label.grid(row=len(self.TECLADO_FILAS), column=0, pady=(6, 0))
+
+    def _estados_letras(self):
+        """ Mejor estado de cada letra escrita en la parrilla (verde > amarillo > gris). """
+        estados = {}
+        for row in self.grid_cells:
+            for cell_data in row:
+                letra = cell_data['widget'].get().lower()
+                if letra and self.states.index(cell_data['state']) >= self.states.index(estados.get(letra, 'absent')):
+                    estados[letra] = cell_data['state']
+        return estados
+
+    @staticmethod
+    def _color_calor(fraccion):
+        """ Interpola entre gris neutro (0) y el azul de acento (1). """
+        bajo, alto = (0x56, 0x57, 0x58), (0x00, 0x78, 0xd4)
+        return "#%02x%02x%02x" % tuple(round(b + (a - b) * fraccion) for b, a in zip(bajo, alto))
+
+    def update_keyboard(self):
+        estados = self._estados_letras()
+        total, letras, posiciones = self.estadisticas_teclado or (0, {}, [])
+        for letra, tecla in self.teclas.items():
+            if letra in estados:
+                bg = self.current_colors[estados[letra]]
+            elif total:
+                bg = self._color_calor(letras.get(letra, 0) / total)
+            else:
+                bg = self._color_calor(0)
+            tecla.config(bg=bg, fg=self.current_colors['text'])
+
+        if total:
+            partes = []
+            for i, contador in enumerate(posiciones):
+                letra, n = max(contador.items(), key=itemgetter(1), default=("-", 0))
+                partes.append(f"{i + 1}:{letra.upper()} {n * 100 // total}%")
+            self.posiciones_label.config(text="  ".join(partes))
+        else:
+            self.posiciones_label.config(text="")
+
     def on_cell_click(self, row, col):
         """ Cicla entre los estados 'absent', 'present', 'correct' al hacer clic DERECHO. """
         cell_data = self.grid_cells[row][col]
@@ -235,6 +250,59 @@ class WordleSolverApp:
             widget.delete(0, tk.END)
             widget.insert(0, current_text.upper())
 
+        self.update_row_count(row)
+        self.update_keyboard()
+
+    # NUEVO: Actualiza el conteo de la fila con el prefijo escrito hasta ahora
+    def update_row_count(self, row):
+        prefijo = ""
+        for cell_data in self.grid_cells[row]:
+            letra = cell_data['widget'].get()
+            if not letra:
+                break
+            prefijo += letra.lower()
+
+        if not prefijo:
+            self.row_labels[row].config(text="")
+            return
+
+        en_diccionario, en_candidatos = self.indice.contar(prefijo)
+        if len(prefijo) == self.palabra_longitud:
+            texto = "✔ palabra válida" if en_diccionario else "✘ no está en el diccionario"
+            if en_diccionario and en_candidatos is not None:
+                texto += " (candidata)" if en_candidatos else " (descartada)"
+        else:
+            texto = f"📖 {en_diccionario}"
+            if en_candidatos is not None:
+                texto += f" · 🎯 {en_candidatos}"
+        self.row_labels[row].config(text=texto)
+
+    def update_row_counts(self):
+        for r in range(self.num_intentos):
+            self.update_row_count(r)
+
+    # NUEVO: Activa o desactiva la grabación de trazas
+    def on_toggle_grabacion(self):
+        if self.grabar_var.get():
+            nombre = datetime.now().strftime("sesion_%Y%m%d_%H%M%S.jsonl")
+            self.registro_trazas = RegistroTrazas(os.path.join(os.path.abspath("."), "trazas", nombre))
+            self.spinner_label.config(text=f"⏺ Grabando la sesión en {self.registro_trazas.ruta}")
+        else:
+            self.registro_trazas = None
+            self.spinner_label.config(text="⏹ Grabación detenida.")
+
+    # NUEVO: Estado de la parrilla en formato compacto para las trazas
+    def _filas_parrilla(self):
+        """ Devuelve las filas no vacías como pares [letras, estados] (0=gris, 1=amarillo, 2=verde). """
+        filas = []
+        for row in self.grid_cells:
+            letras = "".join(cell_data['widget'].get().lower() or " " for cell_data in row)
+            if not letras.strip():
+                continue
+            estados = "".join(str(self.states.index(cell_data['state'])) for cell_data in row)
+            filas.append([letras, estados])
+        return filas
+
     def update_grid_colors(self):
         for r in range(self.num_intentos):
             for c in range(self.palabra_longitud):
@@ -247,11 +315,17 @@ class WordleSolverApp:
                 
                 widget.config(bg=bg_color, fg=text_color, insertbackground=text_color)
 
+        self.update_keyboard()
+
     def reset_grid(self):
         for row in self.grid_cells:
             for cell_data in row:
                 cell_data['widget'].delete(0, tk.END)
                 cell_data['state'] = 'absent'
+        self.indice.limpiar_candidatos()
+        self.estadisticas.limpiar()
+        self.estadisticas_teclado = None
+        self.update_row_counts()
         self.update_grid_colors()
         self.spinner_label.config(text="✨ Parrilla reiniciada. ¡Listo para un nuevo intento!")
         self.resultado.delete(1.0, tk.END)
@@ -279,15 +353,33 @@ class WordleSolverApp:
             cell_widget = self.grid_cells[target_row_index][i]['widget']
             cell_widget.delete(0, tk.END)
             cell_widget.insert(0, char)
+        self.update_row_count(target_row_index)
+        self.update_keyboard()
+
+    # NUEVO: Muestra el conteo y las sugerencias provisionales mientras la búsqueda avanza
+    def mostrar_progreso(self, total, provisional):
+        texto = f"⏳ {total} palabras posibles hasta ahora..."
+        if provisional:
+            texto += " Provisionales: " + ", ".join(p.upper() for p in provisional[:5])
+        self.spinner_label.config(text=texto)
+
+    # NUEVO: Hace clicable una palabra insertada con la etiqueta `tag_name`
+    def _hacer_clicable(self, tag_name, word):
+        self.resultado.tag_config(tag_name, foreground="#66b3ff", underline=True)
+        self.resultado.tag_bind(tag_name, "<Enter>", lambda e, t=tag_name: self.resultado.config(cursor="hand2"))
+        self.resultado.tag_bind(tag_name, "<Leave>", lambda e, t=tag_name: self.resultado.config(cursor=""))
+        self.resultado.tag_bind(tag_name, "<Button-1>", lambda e: self.on_suggestion_click(word))
 
     # MODIFICADO: La función `mostrar_resultados` ahora crea enlaces clicables
     # MODIFICADO: Versión corregida y simplificada que SÍ muestra las palabras clicables
     # y elimina la "lista completa".
-    def mostrar_resultados(self, palabras):
+    def mostrar_resultados(self, total, top, exacto=None, estadisticas=None):
         """
         Actualiza la UI, mostrando solo las mejores palabras clicables en la parte superior
         y conservando el historial de búsqueda.
         """
+        self.estadisticas_teclado = estadisticas
+
         # 1. Poner el widget en modo NORMAL para poder modificarlo
         self.resultado.config(state=tk.NORMAL)
 
@@ -299,11 +391,8 @@ class WordleSolverApp:
         # 3. Insertar el contenido nuevo, línea por línea, EN ORDEN INVERSO
         # Esto asegura que aparezcan en el orden correcto en la parte superior.
 
-        if palabras:
-            # Primero, obtener la lista de las 10 mejores palabras
-            top = mejores_palabras(palabras, dict(sugerir_letras(palabras)))
-
-            # Segundo, iterar la lista de mejores palabras EN REVERSA para insertarlas
+        if top:
+            # Primero, iterar la lista de mejores palabras EN REVERSA para insertarlas
             for p in reversed(top):
                 tag_name = f"suggestion_{p}"
                 
@@ -311,16 +400,33 @@ class WordleSolverApp:
                 self.resultado.insert("1.0", f"  • {p.upper()}\n", ("list_item", tag_name))
                 
                 # INMEDIATAMENTE después de insertarla, hacerla clicable
-                self.resultado.tag_config(tag_name, foreground="#66b3ff", underline=True)
-                self.resultado.tag_bind(tag_name, "<Enter>", lambda e, t=tag_name: self.resultado.config(cursor="hand2"))
-                self.resultado.tag_bind(tag_name, "<Leave>", lambda e, t=tag_name: self.resultado.config(cursor=""))
-                self.resultado.tag_bind(tag_name, "<Button-1>", lambda e, word=p: self.on_suggestion_click(word))
+                self._hacer_clicable(tag_name, p)
 
-            # Tercero, insertar el encabezado de las mejores palabras
+            # Segundo, insertar el encabezado de las mejores palabras
             self.resultado.insert("1.0", "🏆 MEJORES PALABRAS (clic para usar):\n", "h1")
         
-        # Cuarto, insertar el resumen de la búsqueda (siempre al principio)
-        self.resultado.insert("1.0", f"🔎 Se encontraron {len(palabras)} palabras posibles.\n\n")
+        # NUEVO: Resultado del modo exacto (solo con pocos candidatos), encima de la heurística
+        if exacto == "limite":
+            self.resultado.insert("1.0", "⏱ Modo exacto: límite de cálculo alcanzado, se muestra solo la heurística.\n\n")
+        elif exacto is not None:
+            optima, valor, valor_heuristico, completo = exacto
+            if top and valor_heuristico is not None and valor_heuristico > valor + EPSILON_EXACTO:
+                self.resultado.insert("1.0", f"  ⚠️ La heurística propone {top[0].upper()} ({valor_heuristico:.3f})\n\n", "list_item")
+            elif top:
+                self.resultado.insert("1.0", "  ✔ Coincide con la primera sugerencia heurística.\n\n", "list_item")
+            tag_name = f"suggestion_{optima}"
+            self.resultado.insert("1.0", f"  • {optima.upper()} ({valor:.3f} intentos esperados)\n", ("list_item", tag_name))
+            self._hacer_clicable(tag_name, optima)
+            if completo:
+                self.resultado.insert("1.0", "🎯 ÓPTIMO EXACTO:\n", "h1")
+            else:
+                # No dio tiempo a probar todo el diccionario: es el óptimo entre las candidatas
+                # y las demás palabras que se llegaron a probar
+                self.resultado.insert("1.0", "  (óptimo entre las candidatas; no dio tiempo a revisar todo el diccionario)\n", "separator")
+                self.resultado.insert("1.0", "🎯 MEJOR INTENTO:\n", "h1")
+
+        # Tercero, insertar el resumen de la búsqueda (siempre al principio)
+        self.resultado.insert("1.0", f"🔎 Se encontraron {total} palabras posibles.\n\n")
 
         # 5. (Opcional pero recomendado) Reconfigurar estilos generales
         self.resultado.tag_config("h1", font=("Segoe UI", 16, "bold"), spacing3=10)
@@ -330,6 +436,10 @@ class WordleSolverApp:
 
         # 6. Volver a poner el widget en modo de solo lectura
         self.resultado.config(state=tk.DISABLED)
+
+        # 7. Refrescar los conteos de las filas y el teclado con los nuevos candidatos
+        self.update_row_counts()
+        self.update_keyboard()
         
         self.finalizar_busqueda(True)
     # ... (El resto de las funciones: parse_grid_state, ejecutar_busqueda_threaded, etc., permanecen igual que en la versión corregida anterior) ...
@@ -408,22 +518,49 @@ class WordleSolverApp:
 
     def ejecutar_busqueda_threaded(self):
         self.search_button.config(state=tk.DISABLED)
+        # NUEVO: Limpiar modifica el índice y las estadísticas que usa la búsqueda en curso
+        self.reset_button.config(state=tk.DISABLED)
         self.spinner_label.config(text="⏳ Calculando las mejores palabras...")
         threading.Thread(target=self.ejecutar_busqueda, daemon=True).start()
 
     def ejecutar_busqueda(self):
         try:
+            # NUEVO: Se mide cada fase para poder registrarla en la traza de la sesión
+            t0 = time.perf_counter()
+
             # La firma de parse_grid_state y generar_palabras ha cambiado.
             patron, min_counts, exact_counts, descartadas, prohibidas = self.parse_grid_state()
-            
-            # Filtrar diccionario solo por longitud una vez
-            diccionario_filtrado = {p for p in diccionario_es if len(p) == self.palabra_longitud}
-            
-            # Llamar a la nueva función generar_palabras con los argumentos correctos
-            palabras = generar_palabras(patron, min_counts, exact_counts, descartadas, prohibidas, diccionario_filtrado)
+            tiempos = {"parse": time.perf_counter() - t0}
+
+            # MODIFICADO: Filtro, conteo y ranking en flujo sobre el índice (ya filtrado por longitud).
+            # El progreso provisional se envía al hilo principal con root.after.
+            total, top, tiempos_flujo = buscar_en_flujo(
+                patron, min_counts, exact_counts, descartadas, prohibidas, self.indice,
+                estadisticas=self.estadisticas,
+                al_progreso=lambda n, provisional: self.root.after(0, self.mostrar_progreso, n, provisional)
+            )
+            tiempos.update(tiempos_flujo)
+
+            # NUEVO: Con pocos candidatos, calcular también el intento óptimo exacto
+            exacto = None
+            if 1 < total <= LIMITE_EXACTO:
+                t1 = time.perf_counter()
+                exacto = SolucionadorExacto().resolver(
+                    self.indice.candidatos(), top[0] if top else None, self.indice.palabras
+                ) or "limite"
+                tiempos["exacto"] = time.perf_counter() - t1
+
+            registro = self.registro_trazas
+            if registro is not None:
+                tiempos_ms = {fase: round(t * 1000, 3) for fase, t in tiempos.items()}
+                registro.escribir(serializar_busqueda(
+                    self._filas_parrilla(), patron, min_counts, exact_counts,
+                    descartadas, prohibidas, self.indice.candidatos(), top, tiempos_ms,
+                    incremental=self.estadisticas.incremental, exacto=exacto
+                ))
             
             # --- Actualización de la UI (en el hilo principal) ---
-            self.root.after(0, self.mostrar_resultados, palabras)
+            self.root.after(0, self.mostrar_resultados, total, top, exacto, self.estadisticas.instantanea())
 
         except Exception as e:
             # Es buena práctica imprimir el error para depuración
@@ -439,6 +576,7 @@ class WordleSolverApp:
         else:
             self.spinner_label.config(text="❌ Ocurrió un error durante la búsqueda.")
         self.search_button.config(state=tk.NORMAL)
+        self.reset_button.config(state=tk.NORMAL)
 
     # NUEVO: Método para comprobar si hay actualizaciones en GitHub
     def check_for_updates(self):